@@ -1,12 +1,14 @@
 #Imports
 from __future__ import annotations
+import argparse
 from pathlib import Path
 from typing import List
 import numpy as np
 from joblib import Parallel, delayed
 from src.gen_data import get_decks
-from src.score_data import score_humble_nishiyama, score_humble_nishiyama_cards
-from src.viz_data import save_p2_win_prob_heatmap_from_counts
+from src.score_data import (SCORING_BACKENDS, check_backends, control_variate_probs, pattern_counts, score_decks,
+                             select_backend)
+from src.viz_data import render_heatmaps
 
 
 
@@ -17,11 +19,17 @@ DATA_DIR = Path(__file__).resolve().parent / "data"
 FIG_DIR = Path(__file__).resolve().parent / "figures"
 SUMMARY_FILE = DATA_DIR / "score_summary.npz"
 MANUAL_SAVE_FILE = DATA_DIR / "manual_decks_scored.npy"
+#"plain" uses raw win/tie frequencies, "control_variate" corrects them with the exactly known
+#expected pattern counts of a 26/26 deck (same confidence from fewer decks)
+ESTIMATOR = "control_variate"
+SCORING_BACKEND = None #Name from src.score_data.SCORING_BACKENDS, or None to use the fastest available
 
 
 PATTERN_COUNT = 8
 DIAG_MASK = np.eye(PATTERN_COUNT, dtype=bool)
 PARALLEL_CHUNK_SIZE = 512
+WINDOWS_PER_DECK = 50 #Number of 3-card windows in a 52-card deck
+SCORING_RULES = {"trick": "Tricks", "card": "Cards"} #Count key prefix -> heatmap title
 
 
 def _ensure_dirs() -> None:
@@ -31,36 +39,62 @@ def _ensure_dirs() -> None:
 
 def _empty_counts() -> dict[str, np.ndarray]:
     zero = np.zeros((PATTERN_COUNT, PATTERN_COUNT), dtype=np.int64)
+    zero_x = np.zeros((PATTERN_COUNT, PATTERN_COUNT, PATTERN_COUNT), dtype=np.int64)
     return {
         "p2_trick_wins": zero.copy(),
         "trick_ties": zero.copy(),
         "p2_card_wins": zero.copy(),
-        "card_ties": zero.copy(),}
-
-
-def _save_summary(total_decks: int, counts: dict[str, np.ndarray]) -> None:
-    np.savez(
-        SUMMARY_FILE,
-        total_decks=np.array(total_decks, dtype=np.int64),
-        p2_trick_wins=counts["p2_trick_wins"],
-        trick_ties=counts["trick_ties"],
-        p2_card_wins=counts["p2_card_wins"],
-        card_ties=counts["card_ties"],)
+        "card_ties": zero.copy(),
+        #Running moments of the per-deck pattern counts, used by the control-variate estimator
+        "pattern_sum": np.zeros(PATTERN_COUNT, dtype=np.int64),
+        "pattern_sq_sum": zero.copy(),
+        "trick_win_pattern_sum": zero_x.copy(),
+        "trick_tie_pattern_sum": zero_x.copy(),
+        "card_win_pattern_sum": zero_x.copy(),
+        "card_tie_pattern_sum": zero_x.copy(),}
+
+
+def _save_summary(total_decks: int, counts: dict[str, np.ndarray], path: Path | None = None,
+                  run_options: dict[str, int | tuple[int, int]] | None = None) -> None:
+    path = SUMMARY_FILE if path is None else path
+    #Options of the run that produced the counts are stored as run_<name> so a resume can check them
+    options = {f"run_{name}": np.array(value, dtype=np.int64) for name, value in (run_options or {}).items()}
+    #Write then rename so an interrupted run never leaves a truncated summary behind
+    #(the .partial suffix keeps leftovers out of the summary globs used by merge/report)
+    tmp_path = path.with_name(path.name + ".partial")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, total_decks=np.array(total_decks, dtype=np.int64), **counts, **options)
+    tmp_path.replace(path)
 
 #Loads existing scored decks
-def _load_summary() -> tuple[int, dict[str, np.ndarray]]:
-    if not SUMMARY_FILE.exists():
+def _load_summary(path: Path | None = None) -> tuple[int, dict[str, np.ndarray]]:
+    path = SUMMARY_FILE if path is None else path
+    if not path.exists():
         return 0, _empty_counts()
 
-    with np.load(SUMMARY_FILE) as data:
+    counts = _empty_counts()
+    with np.load(path) as data:
         total = int(data["total_decks"])
-        counts = {
-            "p2_trick_wins": np.array(data["p2_trick_wins"], dtype=np.int64),
-            "trick_ties": np.array(data["trick_ties"], dtype=np.int64),
-            "p2_card_wins": np.array(data["p2_card_wins"], dtype=np.int64),
-            "card_ties": np.array(data["card_ties"], dtype=np.int64),}
+        #Older summaries predate the pattern moments; those keys stay zero
+        for key in counts:
+            if key in data:
+                counts[key] = np.array(data[key], dtype=np.int64)
     return total, counts
 
+def _load_run_options(path: Path) -> dict[str, int | tuple[int, int]]:
+    """
+    Run options saved alongside a summary by ``run`` (empty for summaries written without them).
+    """
+    if not path.exists():
+        return {}
+    options: dict[str, int | tuple[int, int]] = {}
+    with np.load(path) as data:
+        for key in data.files:
+            if key.startswith("run_"):
+                value = data[key]
+                options[key[len("run_"):]] = tuple(int(v) for v in value) if value.ndim else int(value)
+    return options
+
 #Helper Function to print batch number lines when scoring
 def _next_auto_batch_index() -> int:
     max_idx = -1
@@ -105,48 +139,51 @@ def augment_data() -> np.ndarray:
     print(f"Generated {stacked.shape[0]} deck(s) using seed {seed}.")
     return stacked
 
-def _score_batch(decks: np.ndarray, counts: dict[str, np.ndarray]) -> None:
+def _score_batch(decks: np.ndarray, counts: dict[str, np.ndarray], n_jobs: int = -1,
+                 backend: str | None = None) -> None:
     if decks.size == 0:
         return
-
-    def _score_chunk(chunk: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-        local_trick_wins = np.zeros((PATTERN_COUNT, PATTERN_COUNT), dtype=np.int64)
-        local_trick_ties = np.zeros_like(local_trick_wins)
-        local_card_wins = np.zeros_like(local_trick_wins)
-        local_card_ties = np.zeros_like(local_trick_wins)
-
-        for deck in chunk:
-            trick_scores = score_humble_nishiyama(deck)
-            card_scores = score_humble_nishiyama_cards(deck)
-
-            trick_wins = (trick_scores.T > trick_scores).astype(np.int64)
-            trick_ties = (trick_scores.T == trick_scores).astype(np.int64)
-            card_wins = (card_scores.T > card_scores).astype(np.int64)
-            card_ties = (card_scores.T == card_scores).astype(np.int64)
-
-            trick_wins[DIAG_MASK] = 0
-            trick_ties[DIAG_MASK] = 0
-            card_wins[DIAG_MASK] = 0
-            card_ties[DIAG_MASK] = 0
-
-            local_trick_wins += trick_wins
-            local_trick_ties += trick_ties
-            local_card_wins += card_wins
-            local_card_ties += card_ties
-
-        return local_trick_wins, local_trick_ties, local_card_wins, local_card_ties
+    #Resolve once here so the threads below don't race to benchmark the backends
+    backend = SCORING_BACKEND if backend is None else backend
+    backend = select_backend() if backend is None else backend
+
+    def _score_chunk(chunk: np.ndarray) -> dict[str, np.ndarray]:
+        trick_scores, card_scores = score_decks(chunk, backend=backend)
+        #P2's score for matchup (i, j) is P1's score for (j, i)
+        trick_p2 = trick_scores.transpose(0, 2, 1)
+        card_p2 = card_scores.transpose(0, 2, 1)
+
+        trick_wins = (trick_p2 > trick_scores).astype(np.int64)
+        trick_ties = (trick_p2 == trick_scores).astype(np.int64)
+        card_wins = (card_p2 > card_scores).astype(np.int64)
+        card_ties = (card_p2 == card_scores).astype(np.int64)
+
+        for outcome in (trick_wins, trick_ties, card_wins, card_ties):
+            outcome[:, DIAG_MASK] = 0
+
+        #Per-deck pattern counts are the control variates (their means are known exactly)
+        x = pattern_counts(chunk)
+        return {
+            "p2_trick_wins": trick_wins.sum(axis=0),
+            "trick_ties": trick_ties.sum(axis=0),
+            "p2_card_wins": card_wins.sum(axis=0),
+            "card_ties": card_ties.sum(axis=0),
+            "pattern_sum": x.sum(axis=0),
+            "pattern_sq_sum": x.T @ x,
+            "trick_win_pattern_sum": np.einsum("dij,dk->ijk", trick_wins, x),
+            "trick_tie_pattern_sum": np.einsum("dij,dk->ijk", trick_ties, x),
+            "card_win_pattern_sum": np.einsum("dij,dk->ijk", card_wins, x),
+            "card_tie_pattern_sum": np.einsum("dij,dk->ijk", card_ties, x),}
 
     chunk_size = min(max(1, PARALLEL_CHUNK_SIZE), decks.shape[0])
     chunks = [decks[start:start + chunk_size] for start in range(0, decks.shape[0], chunk_size)]
 
     #Run parallel intstead of sequentially, uses all avalible cpus to speed up scoring (n_jobs=-1)
-    results = Parallel(n_jobs=-1, prefer="threads")(delayed(_score_chunk)(chunk) for chunk in chunks)
+    results = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(_score_chunk)(chunk) for chunk in chunks)
 
-    for trick_wins, trick_ties, card_wins, card_ties in results:
-        counts["p2_trick_wins"] += trick_wins
-        counts["trick_ties"] += trick_ties
-        counts["p2_card_wins"] += card_wins
-        counts["card_ties"] += card_ties
+    for local in results:
+        for key, value in local.items():
+            counts[key] += value
 
 
 def _score_generated_decks(counts: dict[str, np.ndarray], current_total: int) -> tuple[int, int]:
@@ -175,29 +212,291 @@ def _score_generated_decks(counts: dict[str, np.ndarray], current_total: int) ->
 
     return produced, current_total + produced
 
+def _estimate_counts(total_decks: int, counts: dict[str, np.ndarray],
+                     rule: str) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Return the (win, tie) counts handed to the heatmap for `rule` ("trick" or "card"), and
+    whether the control-variate correction was applied. With ESTIMATOR == "control_variate"
+    these are the corrected probabilities scaled back to counts, so the heatmap code is unchanged.
+    """
+    win_counts = counts[f"p2_{rule}_wins"]
+    tie_counts = counts[f"{rule}_ties"]
+    if ESTIMATOR != "control_variate":
+        return win_counts, tie_counts, False
+
+    #Every deck adds exactly WINDOWS_PER_DECK to pattern_sum, so this is the number of decks with moments
+    covered = int(counts["pattern_sum"].sum()) // WINDOWS_PER_DECK
+    if covered != total_decks or total_decks < 2:
+        print(f"Control variates unavailable for {rule}s ({covered} of {total_decks} decks have pattern "
+              "statistics); using plain frequencies. Rescore the decks (e.g. main.py run, then main.py merge) "
+              "to enable the correction.")
+        return win_counts, tie_counts, False
+
+    estimates = []
+    for outcome, outcome_counts in (("win", win_counts), ("tie", tie_counts)):
+        probs, reduction = control_variate_probs(
+            outcome_counts,
+            counts[f"{rule}_{outcome}_pattern_sum"],
+            counts["pattern_sum"],
+            counts["pattern_sq_sum"],
+            total_decks,)
+        print(f"Control variates ({rule} {outcome}s): variance reduction mean {np.nanmean(reduction):.2f}x, "
+              f"min {np.nanmin(reduction):.2f}x, max {np.nanmax(reduction):.2f}x")
+        estimates.append(probs * total_decks)
+    return estimates[0], estimates[1], True
+
+
+def _heatmap_jobs(total_decks: int, counts: dict[str, np.ndarray], label: str = "") -> list[dict]:
+    """
+    Heatmap render jobs (one per scoring rule) for a single summary.
+    `label` tags figures from a non-default summary, e.g. a shard.
+    """
+    jobs = []
+    for rule, rule_title in SCORING_RULES.items():
+        win_counts, tie_counts, corrected = _estimate_counts(total_decks, counts, rule)
+        suffix = f"_{label}" if label else ""
+        #Mark control-variate estimates so a figure shows which estimate it holds
+        title_suffix = (", CV" if corrected else "") + (f", {label}" if label else "")
+        jobs.append({
+            "win_counts": win_counts,
+            "tie_counts": tie_counts,
+            "total_decks": total_decks,
+            "filename": f"my_win_{rule}s{suffix}.png",
+            "title": f"My Chance of Win(Draw)\n (By {rule_title}, n={total_decks}{title_suffix})",})
+    return jobs
+
+
+def _render_report(jobs: list[dict], n_jobs: int = -1, force: bool = False) -> None:
+    for path, rendered in render_heatmaps(jobs, out_dir=str(FIG_DIR), n_jobs=n_jobs, force=force):
+        print(f"{'Heatmap saved as' if rendered else 'Heatmap up to date'}: {path}")
+
+
 def _build_heatmaps(total_decks: int, counts: dict[str, np.ndarray]) -> None:
     if total_decks == 0: #Safety Check
         print("No decks scored. Skipping heatmaps.")
         return
+    _render_report(_heatmap_jobs(total_decks, counts))
+
+
+def report(summary_files: list[Path] | None = None, n_jobs: int = -1, force: bool = False,
+           merge: bool = False) -> None:
+    """
+    Render the heatmap grid (every scoring rule x every summary) in one pass.
+    Defaults to the main summary plus all merged and shard summaries in DATA_DIR. With `merge`,
+    shard summaries are first combined (see ``merge_shards``). Figures whose inputs are
+    unchanged since they were last rendered are skipped unless `force` is set.
+    """
+    if merge:
+        merge_shards()
+    if summary_files is None:
+        summary_files = [SUMMARY_FILE, *sorted(DATA_DIR.glob("score_summary_merged*.npz")),
+                         *sorted(DATA_DIR.glob("score_summary_shard*of*.npz"))]
+
+    jobs = []
+    for path in summary_files:
+        if not path.exists():
+            print(f"Summary {path} not found. Skipping.")
+            continue
+        total_decks, counts = _load_summary(path)
+        if total_decks == 0:
+            print(f"No decks scored in {path}. Skipping.")
+            continue
+        label = "" if path.resolve() == SUMMARY_FILE.resolve() else path.stem.replace("score_summary_", "", 1)
+        jobs.extend(_heatmap_jobs(total_decks, counts, label))
+    _render_report(jobs, n_jobs=n_jobs, force=force)
+
+def _parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse a "i/N" shard spec (0 <= i < N).
+    """
+    try:
+        index_str, count_str = value.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like i/N, got {value!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must satisfy 0 <= i < N, got {value!r}")
+    return index, count
+
+
+def _shard_batches(n_decks: int, batch_size: int, shard: tuple[int, int]) -> list[tuple[int, int]]:
+    """
+    Split decks [0, n_decks) into batches of `batch_size` and return the (batch_index, size)
+    pairs owned by `shard`. Batches are dealt round-robin, so the partition only depends on
+    n_decks, batch_size and the shard count.
+    """
+    index, count = shard
+    n_batches = (n_decks + batch_size - 1) // batch_size
+    return [(b, min(batch_size, n_decks - b * batch_size)) for b in range(index, n_batches, count)]
+
+
+def _shard_summary_file(shard: tuple[int, int]) -> Path:
+    index, count = shard
+    return DATA_DIR / f"score_summary_shard{index:03d}of{count:03d}.npz"
+
+
+def run(n_decks: int, batch_size: int, seed: int, workers: int, shard: tuple[int, int] = (0, 1),
+        save_decks: bool = False, backend: str | None = None, check_backend: str | None = None,
+        check_sample: int = 256) -> Path:
+    """
+    Score this shard's part of the deck index space without any user interaction.
+    Batch b covers decks [b * batch_size, (b + 1) * batch_size) and is generated with
+    seed + b * batch_size, so every shard reproduces the same decks regardless of how
+    many shards or workers are used. Progress is saved after each batch and a rerun
+    resumes where the shard left off. Returns the shard's summary path.
+
+    If `check_backend` is given, `check_sample` decks sampled from every batch are also scored
+    with that backend and the run stops if its scores differ from the main backend's.
+    """
+    _ensure_dirs()
+    backend = SCORING_BACKEND if backend is None else backend
+    backend = select_backend() if backend is None else backend
+    summary_file = _shard_summary_file(shard)
+    batches = _shard_batches(n_decks, batch_size, shard)
+    target = sum(size for _, size in batches)
+
+    run_options = {"seed": seed, "batch_size": batch_size, "n_decks": n_decks, "shard": tuple(shard)}
+    total, counts = _load_summary(summary_file)
+    if total:
+        saved_options = _load_run_options(summary_file)
+        if saved_options != run_options:
+            raise ValueError(f"{summary_file} was written with options {saved_options or 'unknown'}, not "
+                             f"{run_options}; remove it or rerun with the original options.")
+    #Batches are scored in order, so the saved total tells us how many are already done
+    done = 0
+    scored = 0
+    while done < len(batches) and scored + batches[done][1] <= total:
+        scored += batches[done][1]
+        done += 1
+    if scored != total:
+        raise ValueError(f"{summary_file} holds {total} decks, which does not match shard {shard[0]}/{shard[1]} "
+                         f"with batch size {batch_size}; remove it or rerun with the original options.")
+
+    print(f"Shard {shard[0]}/{shard[1]}: {total}/{target} deck(s) already scored, {len(batches) - done} batch(es) left.")
+    for batch_idx, size in batches[done:]:
+        decks = get_decks(size, seed=seed + batch_idx * batch_size)
+        if save_decks:
+            np.save(DATA_DIR / f"decks_run_batch{batch_idx:05d}.npy", decks)
+        if check_backend is not None:
+            rng = np.random.default_rng(seed + batch_idx)
+            sample = rng.choice(size, size=min(check_sample, size), replace=False)
+            check_backends(decks[sample], backend, check_backend)
+        _score_batch(decks, counts, n_jobs=workers, backend=backend)
+        total += size
+        _save_summary(total, counts, summary_file, run_options)
+        print(f"Scored batch {batch_idx} ({size} decks, shard total {total}/{target})")
+
+    print(f"Saved shard summary to {summary_file}")
+    return summary_file
+
+
+def merge_shards() -> list[Path]:
+    """
+    Sum the shard summaries in DATA_DIR into one summary per shard count N
+    (score_summary_mergedNNN.npz). All counts and pattern moments are additive, so the merged
+    file is exactly what a single unsharded run over the same decks would have saved.
+    Shards of one N must share seed, batch size and deck count. Unsharded runs (N == 1) are
+    skipped since their shard summary already is the full result. Returns the merged paths.
+    """
+    groups: dict[int, list[Path]] = {}
+    for path in sorted(DATA_DIR.glob("score_summary_shard*of*.npz")):
+        options = _load_run_options(path)
+        if "shard" not in options:
+            print(f"{path} has no run options. Skipping.")
+            continue
+        groups.setdefault(options["shard"][1], []).append(path)
+
+    merged_paths = []
+    for shard_count, paths in sorted(groups.items()):
+        if shard_count == 1:
+            continue
+        merged_total, merged_counts = 0, _empty_counts()
+        merged_options: dict[str, int | tuple[int, int]] | None = None
+        for path in paths:
+            options = _load_run_options(path)
+            options.pop("shard")
+            if merged_options is None:
+                merged_options = options
+            elif options != merged_options:
+                raise ValueError(f"{path} was written with options {options}, but other shards of "
+                                 f"{shard_count} used {merged_options}; cannot merge them.")
+            total, counts = _load_summary(path)
+            merged_total += total
+            for key, value in counts.items():
+                merged_counts[key] += value
+
+        merged_file = DATA_DIR / f"score_summary_merged{shard_count:03d}.npz"
+        _save_summary(merged_total, merged_counts, merged_file, merged_options)
+        expected = merged_options["n_decks"] if merged_options else 0
+        status = "complete" if merged_total == expected else f"incomplete, target {expected}"
+        print(f"Merged {len(paths)} of {shard_count} shard(s) into {merged_file} ({merged_total} decks, {status})")
+        merged_paths.append(merged_file)
+    return merged_paths
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Score Humble-Nishiyama decks and build the P2 win heatmaps.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser(
+        "run", help="Non-interactive, shardable scoring run (writes one summary per shard).")
+    run_parser.add_argument("--decks", type=int, default=N_DECKS, help=f"Target deck count (default {N_DECKS}).")
+    run_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                            help=f"Decks generated and scored per batch (default {BATCH_SIZE}).")
+    run_parser.add_argument("--seed", type=int, default=BASE_SEED, help=f"Base seed (default {BASE_SEED}).")
+    run_parser.add_argument("--workers", type=int, default=-1,
+                            help="Scoring workers for this process (-1 uses all cpus). Use 1 when running one process per shard.")
+    run_parser.add_argument("--shard", type=_parse_shard, default=(0, 1),
+                            help="Score only shard i of N, e.g. --shard 3/64 (default 0/1).")
+    run_parser.add_argument("--save-decks", action="store_true", help="Also save each generated batch of decks.")
+    run_parser.add_argument("--backend", choices=sorted(SCORING_BACKENDS), default=SCORING_BACKEND,
+                            help="Scoring backend (default: fastest available).")
+    run_parser.add_argument("--check-backend", choices=sorted(SCORING_BACKENDS),
+                            help="Differential check: also score sampled decks from every batch with this backend "
+                                 "and stop on any mismatch.")
+    run_parser.add_argument("--check-sample", type=int, default=256,
+                            help="Decks per batch used by --check-backend (default 256).")
+
+    report_parser = subparsers.add_parser(
+        "report", help="Render heatmaps for the main and shard summaries, skipping figures that are up to date.")
+    report_parser.add_argument("summaries", nargs="*", type=Path,
+                               help="Summary files to render (default: main summary and all shard summaries).")
+    report_parser.add_argument("--workers", type=int, default=-1,
+                               help="Threads rendering figures concurrently (-1 uses all cpus).")
+    report_parser.add_argument("--force", action="store_true", help="Re-render even if figures are up to date.")
+    report_parser.add_argument("--merge", action="store_true",
+                               help="Combine the shard summaries into merged summaries before rendering.")
+
+    subparsers.add_parser("merge", help="Sum the shard summaries into one summary per shard count.")
+    return parser
+
+
+def _run_command(args: argparse.Namespace) -> None:
+    if args.command == "run":
+        if args.decks < 0 or args.batch_size < 1 or args.workers == 0 or args.check_sample < 1:
+            raise SystemExit("--decks must be >= 0, --batch-size and --check-sample >= 1 and --workers non-zero.")
+        run(args.decks, args.batch_size, args.seed, args.workers, args.shard, args.save_decks,
+            args.backend, args.check_backend, args.check_sample)
+    elif args.command == "report":
+        if args.workers == 0:
+            raise SystemExit("--workers must be non-zero.")
+        _ensure_dirs()
+        report(args.summaries or None, n_jobs=args.workers, force=args.force, merge=args.merge)
+    elif args.command == "merge":
+        _ensure_dirs()
+        merge_shards()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _build_parser().parse_args(argv)
+    if args.command is not None:
+        #Mismatched summaries/options surface as a clean message instead of a traceback
+        try:
+            _run_command(args)
+        except ValueError as exc:
+            raise SystemExit(f"Error: {exc}") from None
+        return
 
-    tricks_fig = save_p2_win_prob_heatmap_from_counts(
-        counts["p2_trick_wins"],
-        counts["trick_ties"],
-        total_decks,
-        out_dir=str(FIG_DIR),
-        filename="my_win_tricks.png",
-        title=f"My Chance of Win(Draw)\n (By Tricks, n={total_decks})",)
-    cards_fig = save_p2_win_prob_heatmap_from_counts(
-        counts["p2_card_wins"],
-        counts["card_ties"],
-        total_decks,
-        out_dir=str(FIG_DIR),
-        filename="my_win_cards.png",
-        title=f"My Chance of Win(Draw)\n (By Cards, n={total_decks})",)
-    print("Tricks heatmap saved as:", tricks_fig)
-    print("Cards heatmap saved as:", cards_fig)
-
-def main() -> None:
     _ensure_dirs()
 
     current_total, counts = _load_summary()
@@ -1,11 +1,22 @@
 import csv
-from collections.abc import Mapping
+import time
+from collections.abc import Callable, Mapping
 from pathlib import Path
 from typing import Tuple
 import numpy as np
-from numba import njit
 from src.gen_data import get_decks
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError: #Kernels below still run (slowly) as plain Python; the numba backend is disabled
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 
 
 #numpy constants reused by the JIT compiled scoring kernels
@@ -108,6 +119,17 @@ def _score_humble_nishiyama_cards(deck: np.ndarray, return_ties: bool) -> tuple[
         return scores, tie_flags
     return scores, tie_flags
 
+@njit(cache=True, nogil=True)
+def _score_decks_numba(decks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    n = decks.shape[0]
+    tricks = np.empty((n, 8, 8), dtype=np.int16)
+    cards = np.empty((n, 8, 8), dtype=np.int16)
+    for d in range(n):
+        tricks[d], _ = _score_humble_nishiyama(decks[d], False)
+        cards[d], _ = _score_humble_nishiyama_cards(decks[d], False)
+    return tricks, cards
+
+
 def _ensure_deck(deck: np.ndarray) -> np.ndarray:
     arr = np.ascontiguousarray(deck, dtype=np.uint8)
     if arr.shape != (52,):
@@ -117,6 +139,15 @@ def _ensure_deck(deck: np.ndarray) -> np.ndarray:
     return arr
 
 
+def _ensure_decks(decks: np.ndarray) -> np.ndarray:
+    arr = np.ascontiguousarray(decks, dtype=np.uint8)
+    if arr.ndim != 2 or arr.shape[1] != 52:
+        raise ValueError("Decks must be a 2D array of shape (n, 52).")
+    if arr.shape[0] and not np.all(arr.sum(axis=1) == 26):
+        raise ValueError("Each deck must contain exactly 26 ones (and 26 zeros).")
+    return arr
+
+
 def _ensure_pattern(pattern: np.ndarray) -> np.ndarray:
     arr = np.ascontiguousarray(pattern, dtype=np.uint8)
     if arr.shape != (3,):
@@ -229,3 +260,245 @@ def p2_win_prob_from_mats(
     tie_probs[np.eye(8, dtype=bool)] = np.nan
     return win_probs, tie_probs
 
+
+
+def expected_pattern_counts(half_deck_size: int = 26) -> np.ndarray:
+    """
+    Exact expected number of (overlapping) occurrences of each 3-card pattern
+    in a shuffled deck of `half_deck_size` zeros and `half_deck_size` ones.
+
+    Returns a length-8 float array indexed like PATTERNS.
+    """
+    n = 2 * half_deck_size
+    windows = n - 2
+    expected = np.empty(8, dtype=np.float64)
+    for idx, pattern in enumerate(PATTERNS):
+        ones = int(pattern.sum())
+        prob = 1.0
+        #Draw the three cards without replacement, one at a time
+        ones_left, zeros_left, cards_left = half_deck_size, half_deck_size, n
+        for card in pattern:
+            if card:
+                prob *= ones_left / cards_left
+                ones_left -= 1
+            else:
+                prob *= zeros_left / cards_left
+                zeros_left -= 1
+            cards_left -= 1
+        expected[idx] = windows * prob
+    return expected
+
+
+def pattern_counts(decks: np.ndarray) -> np.ndarray:
+    """
+    Count overlapping occurrences of each 3-card pattern in a batch of decks.
+    `decks` shape should be (n, 52); returns an (n, 8) int64 array indexed like PATTERNS.
+    """
+    decks = np.asarray(decks, dtype=np.uint8)
+    if decks.ndim != 2:
+        raise ValueError("decks must have shape (n, deck_size)")
+    codes = 4 * decks[:, :-2] + 2 * decks[:, 1:-1] + decks[:, 2:]
+    counts = np.zeros((decks.shape[0], 8), dtype=np.int64)
+    for code in range(8):
+        counts[:, code] = (codes == code).sum(axis=1)
+    return counts
+
+
+def control_variate_probs(outcome_counts: np.ndarray, outcome_x_sums: np.ndarray, x_sums: np.ndarray,
+                          xx_sums: np.ndarray, total_decks: int, *,
+                          half_deck_size: int = 26) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Control-variate estimate of per-matchup outcome probabilities (P2 wins or ties).
+
+    Uses the per-deck pattern counts as controls, whose means are known exactly
+    (see ``expected_pattern_counts``). Inputs are running sums over all scored decks:
+      - outcome_counts: (8, 8) number of decks with the outcome for matchup (i, j)
+      - outcome_x_sums: (8, 8, 8) sum of outcome indicator * pattern counts
+      - x_sums: (8,) sum of pattern counts
+      - xx_sums: (8, 8) sum of outer products of pattern counts
+
+    Returns (probs, variance_reduction), both 8x8 with the diagonal set to NaN.
+    variance_reduction[i, j] is Var(plain) / Var(control variate), i.e. how many
+    times fewer decks the corrected estimate needs for the same confidence.
+    """
+    n = float(total_decks)
+    if total_decks < 2:
+        raise ValueError("Control variates need at least two scored decks.")
+    #The eight counts always sum to the number of windows, so the last one is redundant
+    mu = expected_pattern_counts(half_deck_size)[:-1]
+    mean_x = x_sums[:-1] / n
+    cov_xx = xx_sums[:-1, :-1] / n - np.outer(mean_x, mean_x)
+
+    probs = outcome_counts.astype(np.float64) / n
+    cov_xy = outcome_x_sums[:, :, :-1] / n - probs[:, :, None] * mean_x
+    beta = cov_xy @ np.linalg.pinv(cov_xx, hermitian=True)
+
+    cv_probs = np.clip(probs - beta @ (mean_x - mu), 0.0, 1.0)
+
+    plain_var = probs * (1.0 - probs)
+    resid_var = plain_var - (beta * cov_xy).sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reduction = plain_var / np.maximum(resid_var, 0.0)
+    reduction[plain_var == 0] = 1.0
+
+    diag_mask = np.eye(8, dtype=bool)
+    cv_probs[diag_mask] = np.nan
+    reduction[diag_mask] = np.nan
+    return cv_probs, reduction
+
+
+
+#Scoring backends: name -> function mapping an (n, 52) uint8 deck array to the
+#(tricks, cards) P1 score matrices, each (n, 8, 8) int16 with -1 on the diagonal
+SCORING_BACKENDS: dict[str, Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]]] = {}
+NUMPY_CHUNK_SIZE = 4096 #Decks scored per vectorized step by the numpy backend (bounds memory)
+_BACKEND_STATUS: dict[str, bool] = {}
+_SELECTED_BACKEND: str | None = None
+
+
+def register_backend(name: str) -> Callable:
+    """
+    Decorator registering a batched scoring function under `name`.
+    """
+    def decorator(func: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]]) -> Callable:
+        SCORING_BACKENDS[name] = func
+        _BACKEND_STATUS.pop(name, None)
+        return func
+    return decorator
+
+
+@register_backend("numba")
+def _numba_backend(decks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if not NUMBA_AVAILABLE:
+        raise RuntimeError("numba is not installed.")
+    return _score_decks_numba(decks)
+
+
+@register_backend("numpy")
+def _numpy_backend(decks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pure-NumPy engine scoring every deck and matchup at once, one window position at a time.
+    Both rules share the same state: after a match at window s the next trick can start at
+    s + 3 and the pot restarts at card s + 3, so a single pass fills both score arrays.
+    """
+    n = decks.shape[0]
+    tricks = np.empty((n, 8, 8), dtype=np.int16)
+    cards = np.empty((n, 8, 8), dtype=np.int16)
+    codes = np.arange(8)
+    for start in range(0, n, NUMPY_CHUNK_SIZE):
+        chunk = decks[start:start + NUMPY_CHUNK_SIZE].astype(np.int16)
+        m = chunk.shape[0]
+        windows = 4 * chunk[:, :-2] + 2 * chunk[:, 1:-1] + chunk[:, 2:]
+        hits = windows[:, :, None] == codes #hits[d, s, p]: pattern p occupies window s of deck d
+
+        free_from = np.zeros((m, 8, 8), dtype=np.int16) #First card not yet consumed by a match
+        p1_tricks = np.zeros((m, 8, 8), dtype=np.int16)
+        p1_cards = np.zeros((m, 8, 8), dtype=np.int16)
+        for s in range(windows.shape[1]):
+            active = free_from <= s
+            p1_hit = active & hits[:, s, :, None]
+            matched = p1_hit | (active & hits[:, s, None, :])
+            p1_tricks += p1_hit
+            p1_cards += np.where(p1_hit, s + 3 - free_from, 0).astype(np.int16)
+            free_from[matched] = s + 3
+        tricks[start:start + m] = p1_tricks
+        cards[start:start + m] = p1_cards
+
+    diag = np.eye(8, dtype=bool)
+    tricks[:, diag] = -1
+    cards[:, diag] = -1
+    return tricks, cards
+
+
+def _reference_scores(deck: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score one deck with the plain-Python bodies of the kernels (never touches numba),
+    so backend probing still works when the JIT kernels themselves are broken.
+    """
+    score_tricks_py = getattr(_score_tricks, "py_func", _score_tricks)
+    score_cards_py = getattr(_score_cards, "py_func", _score_cards)
+    tricks = np.full((8, 8), -1, dtype=np.int16)
+    cards = np.full((8, 8), -1, dtype=np.int16)
+    for i in range(8):
+        for j in range(8):
+            if i == j:
+                continue
+            tricks[i, j] = score_tricks_py(deck, PATTERNS[i], PATTERNS[j])[0]
+            cards[i, j] = score_cards_py(deck, PATTERNS[i], PATTERNS[j])[0]
+    return tricks, cards
+
+
+def backend_available(name: str) -> bool:
+    """
+    Whether backend `name` is registered and scores two reference decks like the kernels' Python bodies.
+    The result is cached; a backend that raises (e.g. numba missing or a broken cache) is unavailable.
+    """
+    if name not in SCORING_BACKENDS:
+        return False
+    if name not in _BACKEND_STATUS:
+        probe = np.array([[0, 1] * 26, [0] * 13 + [1] * 26 + [0] * 13], dtype=np.uint8)
+        expected = [_reference_scores(deck) for deck in probe]
+        expected_tricks = np.stack([tricks for tricks, _ in expected])
+        expected_cards = np.stack([cards for _, cards in expected])
+        try:
+            tricks, cards = SCORING_BACKENDS[name](probe)
+        except Exception as exc:
+            print(f"Scoring backend {name!r} unavailable: {exc}")
+            tricks = cards = None
+        ok = tricks is not None and np.array_equal(tricks, expected_tricks) and np.array_equal(cards, expected_cards)
+        if tricks is not None and not ok:
+            print(f"Scoring backend {name!r} unavailable: scores differ from the reference kernels.")
+        _BACKEND_STATUS[name] = bool(ok)
+    return _BACKEND_STATUS[name]
+
+
+def select_backend(sample_size: int = 512, seed: int = 0) -> str:
+    """
+    Pick the fastest available backend by timing each on a sample batch.
+    The choice is cached for the rest of the process.
+    """
+    global _SELECTED_BACKEND
+    if _SELECTED_BACKEND is not None:
+        return _SELECTED_BACKEND
+
+    available = [name for name in SCORING_BACKENDS if backend_available(name)]
+    if not available:
+        raise RuntimeError("No scoring backend is available.")
+    sample = _ensure_decks(get_decks(sample_size, seed=seed))
+    timings = {}
+    for name in available:
+        t0 = time.perf_counter()
+        SCORING_BACKENDS[name](sample)
+        timings[name] = time.perf_counter() - t0
+    _SELECTED_BACKEND = min(timings, key=timings.get)
+    report = ", ".join(f"{name} {t * 1000.0:.1f} ms" for name, t in timings.items())
+    print(f"Scoring backend: {_SELECTED_BACKEND} ({report} per {sample_size} decks)")
+    return _SELECTED_BACKEND
+
+
+def score_decks(decks: np.ndarray, *, backend: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score a batch of decks under both rules with the given backend (fastest available if None).
+    Returns (tricks, cards), each (n, 8, 8) int16 where [d, i, j] is P1's score on deck d
+    when P1 picks pattern i and P2 picks j (-1 on the diagonal).
+    """
+    decks_arr = _ensure_decks(decks)
+    name = select_backend() if backend is None else backend
+    if name not in SCORING_BACKENDS:
+        raise ValueError(f"Unknown scoring backend {name!r}; choose from {sorted(SCORING_BACKENDS)}.")
+    return SCORING_BACKENDS[name](decks_arr)
+
+
+def check_backends(decks: np.ndarray, reference: str, candidate: str) -> None:
+    """
+    Differential check: score `decks` with two backends and raise AssertionError
+    unless both produce identical score matrices for every deck and matchup.
+    """
+    ref_tricks, ref_cards = score_decks(decks, backend=reference)
+    cand_tricks, cand_cards = score_decks(decks, backend=candidate)
+    for rule, ref, cand in (("tricks", ref_tricks, cand_tricks), ("cards", ref_cards, cand_cards)):
+        mismatched = np.any(ref != cand, axis=(1, 2))
+        if mismatched.any():
+            first = int(np.argmax(mismatched))
+            raise AssertionError(f"Backends {reference!r} and {candidate!r} disagree on {rule} for "
+                                 f"{int(mismatched.sum())} of {len(mismatched)} deck(s) (first at index {first}).")
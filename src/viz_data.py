@@ -1,8 +1,15 @@
+import hashlib
 import os
 import numpy as np
-import matplotlib.pyplot as plt
+from joblib import Parallel, delayed
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.patches import Rectangle
 
+#Bump when the heatmap styling changes so existing figures are re-rendered
+RENDER_VERSION = 1
+
 
 def _default_fig_dir() -> str:
     """
@@ -20,6 +27,8 @@ def save_p2_win_prob_heatmap_from_counts(win_counts: np.ndarray, tie_counts: np.
     """
     Save a P2 win probability heatmap using aggregated win/tie counts instead of raw matrices.
     This avoids materializing all score matrices when the deck count is extremely large.
+    Uses the object-oriented Agg API (no pyplot state), so several heatmaps can render concurrently.
+    The pattern length is taken from the matrix size (2**length rows).
     """
     
     if out_dir is None:
@@ -28,24 +37,27 @@ def save_p2_win_prob_heatmap_from_counts(win_counts: np.ndarray, tie_counts: np.
     win_probs = win_counts.astype(np.float64) / float(total_decks)
     tie_probs = tie_counts.astype(np.float64) / float(total_decks)
 
-    diag_mask = np.eye(win_counts.shape[0], dtype=bool)
+    n_patterns = win_counts.shape[0]
+    pattern_len = max(1, (n_patterns - 1).bit_length())
+    diag_mask = np.eye(n_patterns, dtype=bool)
     win_probs[diag_mask] = np.nan
     tie_probs[diag_mask] = np.nan
 
-    cmap = plt.cm.Blues.copy()
+    cmap = colormaps["Blues"].copy()
     cmap.set_bad(color='lightgray')
 
-    plt.figure(figsize=(6.5, 5.5))
-    plt.imshow(np.ma.masked_invalid(win_probs), vmin=0.0, vmax=1.0, cmap=cmap, interpolation='nearest')
+    fig = Figure(figsize=(6.5, 5.5))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.imshow(np.ma.masked_invalid(win_probs), vmin=0.0, vmax=1.0, cmap=cmap, interpolation='nearest')
 
-    ticks = list(range(8))
-    labels = [format(i, '03b') for i in range(8)]
-    plt.xticks(ticks, labels)
-    plt.yticks(ticks, labels)
-    plt.xlabel('My Choice')
-    plt.ylabel('Opponent choice')
-    plt.title(title)
-    ax = plt.gca()
+    ticks = list(range(n_patterns))
+    labels = [format(i, f'0{pattern_len}b') for i in range(n_patterns)]
+    ax.set_xticks(ticks, labels)
+    ax.set_yticks(ticks, labels)
+    ax.set_xlabel('My Choice')
+    ax.set_ylabel('Opponent choice')
+    ax.set_title(title)
 
     #Highlight best cell in each row
     for i in range(win_probs.shape[0]):
@@ -60,17 +72,70 @@ def save_p2_win_prob_heatmap_from_counts(win_counts: np.ndarray, tie_counts: np.
             ax.add_patch(Rectangle((j - 0.5, i - 0.5), 1, 1, fill=False, edgecolor='black', linewidth=1.8, zorder=3))
 
     #Add Dack Combination indices 
-    for i in range(8):
-        for j in range(8):
+    for i in range(n_patterns):
+        for j in range(n_patterns):
             if i == j or np.isnan(win_probs[i, j]):
                 continue
             win_pct = int(round(win_probs[i, j] * 100))
             tie_pct = int(round(tie_probs[i, j] * 100)) if not np.isnan(tie_probs[i, j]) else 0
-            plt.text(j, i, f"{win_pct}({tie_pct})", ha='center', va='center', color='black', fontsize=8)
-    for spine in plt.gca().spines.values():
+            ax.text(j, i, f"{win_pct}({tie_pct})", ha='center', va='center', color='black', fontsize=8)
+    for spine in ax.spines.values():
        spine.set_visible(False)
     out_path = os.path.join(out_dir, filename)
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=150)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
     return out_path
+
+
+def heatmap_fingerprint(win_counts: np.ndarray, tie_counts: np.ndarray, total_decks: int,
+                        title: str | None = None) -> str:
+    """
+    Hash of everything that determines a heatmap's pixels (counts, deck total, title, style version).
+    """
+    h = hashlib.sha256()
+    h.update(f"v{RENDER_VERSION}|{total_decks}|{title}|".encode())
+    for arr in (win_counts, tie_counts):
+        arr = np.ascontiguousarray(arr, dtype=np.float64)
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def render_heatmaps(jobs: list[dict], *, out_dir: str | None = None, n_jobs: int = -1,
+                    force: bool = False) -> list[tuple[str, bool]]:
+    """
+    Render a batch of heatmaps, skipping those whose saved fingerprint matches their inputs.
+    Each job holds the arguments of ``save_p2_win_prob_heatmap_from_counts``
+    (win_counts, tie_counts, total_decks, filename and optionally title).
+    Stale figures are rendered concurrently on `n_jobs` threads (-1 uses all cpus).
+
+    Returns (path, rendered) per job, in job order.
+    """
+    if out_dir is None:
+        out_dir = _default_fig_dir()
+
+    results: list[tuple[str, bool]] = []
+    stale: list[tuple[dict, str, str]] = []
+    for job in jobs:
+        out_path = os.path.join(out_dir, job["filename"])
+        fp_path = out_path + ".fingerprint"
+        fingerprint = heatmap_fingerprint(job["win_counts"], job["tie_counts"], job["total_decks"], job.get("title"))
+        up_to_date = False
+        if not force and os.path.exists(out_path) and os.path.exists(fp_path):
+            with open(fp_path) as f:
+                up_to_date = f.read().strip() == fingerprint
+        results.append((out_path, not up_to_date))
+        if not up_to_date:
+            stale.append((job, fp_path, fingerprint))
+
+    if stale:
+        Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(save_p2_win_prob_heatmap_from_counts)(
+                job["win_counts"], job["tie_counts"], job["total_decks"],
+                out_dir=out_dir, filename=job["filename"], title=job.get("title"))
+            for job, _, _ in stale)
+        #Only record fingerprints once every figure has been written
+        for _, fp_path, fingerprint in stale:
+            with open(fp_path, "w") as f:
+                f.write(fingerprint + "\n")
+    return results